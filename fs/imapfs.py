@@ -1,13 +1,19 @@
 """Pyfilesystem2 over IMAP using IMAPClient.
 """
-import email
+import atexit
+import functools
+import hashlib
 import io
-import itertools
+import queue
 import re
 import socket
+import threading
+import time
 import typing
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from email.parser import HeaderParser
 from imaplib import IMAP4
 from typing import (
     Any,
@@ -25,13 +31,15 @@ from typing import (
 from fs.base import FS
 from fs.enums import ResourceType
 from fs.info import Info as BaseInfo
+from fs.time import epoch_to_datetime
 from fs.mode import Mode
-from fs.path import dirname, join, split
+from fs.path import dirname, split
 from fs.permissions import Permissions
 from fs.subfs import SubFS
 from imapclient import IMAPClient
+from imapclient.imap_utf7 import decode as decode_utf7
+from imapclient.response_parser import parse_fetch_response, parse_response
 from imapclient.response_types import Address, Envelope
-from six import PY2, text_type
 
 from fs import errors
 
@@ -52,10 +60,90 @@ __version__ = distribution.metadata.get("version")
 _F = typing.TypeVar("_F", bound="IMAPFS")
 
 
-RE_APPEND_INFO = re.compile(r"(?<=\[)(?P<list>.*)(?=])")
+STATUS_ITEMS = ("MESSAGES", "RECENT", "UIDNEXT", "UIDVALIDITY", "UNSEEN")
+
+FOLDER_CACHE_TTL = 60.0
+
+IDLE_NOOP_S = 60.0
+
+FETCH_BATCH_SIZE = 500
+
+# most message ids sent in one COPY, STORE or EXPUNGE command, keeping the
+# command line well below the length servers accept
+MESSAGE_SET_SIZE = 1000
+
+MAX_IDLE_CONNECTIONS = 4
+
+INFO_CACHE_TTL = 5.0
+
+INFO_CACHE_SIZE = 64
+
+HEADER_PARSER = HeaderParser()
+
+# RFC 5322 field-name (printable US-ASCII but ":"), sent in FETCH as an atom
+RE_FIELD_NAME = re.compile(r'[^\x00-\x20\x7f-\U0010ffff:(){%*"\\\]]+')
+
+# BODY[...] equivalents of the RFC822 data items, which take no partial range
+RFC822_SECTIONS = {
+    "RFC822": "BODY[]",
+    "RFC822.HEADER": "BODY.PEEK[HEADER]",
+    "RFC822.TEXT": "BODY[TEXT]",
+}
 
 
 class Info(BaseInfo):
+    """Resource info, whose mail header is only parsed when first read.
+
+    Arguments:
+        raw_info (dict): A dict containing resource info.
+        to_datetime (callable): A callable that converts an epoch time to
+            a datetime object.
+        raw_header (bytes): The header of the message as fetched, parsed
+            into ``imap.header`` on first access to it or to `raw`.
+    """
+
+    def __init__(self, raw_info, to_datetime=epoch_to_datetime, raw_header=None):
+        # type: (Dict[Text, Dict[Text, Any]], Any, Optional[bytes]) -> None
+        self._raw_header = None  # type: Optional[bytes]
+        super().__init__(raw_info, to_datetime)
+        self._raw_header = raw_header
+
+    @property
+    def raw(self):
+        # type: () -> Dict[Text, Dict[Text, Any]]
+        """`dict`: the raw info, with ``imap.header`` parsed."""
+        raw_header = self._raw_header
+        if raw_header is not None:
+            header = HEADER_PARSER.parsestr(
+                raw_header.decode("ascii", "surrogateescape")
+            )
+            self._raw["imap"]["header"] = dict(header.items())
+            self._raw_header = None
+        return self._raw
+
+    @raw.setter
+    def raw(self, raw_info):
+        # type: (Dict[Text, Dict[Text, Any]]) -> None
+        self._raw = raw_info
+
+    def get(self, namespace, key, default=None):
+        # type: (Text, Text, Optional[Any]) -> Optional[Any]
+        # only the header needs parsing, other values are read as they are
+        raw = self.raw if (namespace, key) == ("imap", "header") else self._raw
+        try:
+            return raw[namespace].get(key, default)
+        except KeyError:
+            return default
+
+    def _require_namespace(self, namespace):
+        # type: (Text) -> None
+        if namespace not in self._raw:
+            raise errors.MissingInfoNamespace(namespace)
+
+    def has_namespace(self, namespace):
+        # type: (Text) -> bool
+        return namespace in self._raw
+
     @property
     def flags(self):
         # type: () -> Optional[List[str]]
@@ -86,6 +174,21 @@ class Info(BaseInfo):
         self._require_namespace("imap")
         return self.get("imap", "envelope")
 
+    @property
+    def header(self):
+        # type: () -> Optional[Dict[Text, Text]]
+        """`Dict[str, str]`: the mail header fields.
+
+        Requires the ``"imap"`` namespace.
+
+        Raises:
+            ~fs.errors.MissingInfoNamespace: if the ``"imap"``
+                namespace is not in the Info.
+
+        """
+        self._require_namespace("imap")
+        return self.get("imap", "header")
+
 
 def _dir_info(name, flags=tuple(), folder_status=None):
     # type: (Text, Tuple[bytes], Optional[Dict[bytes, bytes]]) -> Info
@@ -100,25 +203,53 @@ def _dir_info(name, flags=tuple(), folder_status=None):
         "imap": {"flags": [flag.decode("ascii") for flag in flags]},
     }
     if folder_status:
-        for state in folder_status:
-            raw_info["imap"][state.decode("ascii").lower()] = folder_status[state]
+        raw_info["imap"].update(
+            (state.decode("ascii").lower(), value)
+            for state, value in folder_status.items()
+        )
     return Info(raw_info)
 
 
-def _tuple_address(address):
-    # type: (Address) -> Tuple[Optional[Text], Optional[Text], Optional[Text], Optional[Text]]
-    name = address.name.decode("ascii") if address.name else None
-    mailbox = address.mailbox.decode("ascii") if address.mailbox else None
-    host = address.host.decode("ascii") if address.host else None
-    route = address.route.decode("ascii") if address.route else None
-    return name, mailbox, host, route
+def _fetch_items(namespaces, header_item="RFC822.HEADER"):
+    # type: (Optional[Collection[Text]], Text) -> List[Text]
+    """Get the FETCH data items needed to fill the requested namespaces."""
+    namespaces = namespaces or ()
+    items = []  # type: List[Text]
+    if "details" in namespaces:
+        items += ["RFC822.SIZE", "ENVELOPE"]
+    if "imap" in namespaces:
+        if "ENVELOPE" not in items:
+            items.append("ENVELOPE")
+        items += ["FLAGS", header_item]
+    return items
 
 
-def _file_info(name, file):
-    # type: (Text, Dict[bytes, Union[bytes, int, Envelope, Iterable[bytes]]]) -> Info
+def _tuple_address(address):
+    # type: (Address) -> Tuple[Optional[Text], Optional[Text], Optional[Text], Optional[Text]]
+    name, mailbox, host, route = (
+        address.name,
+        address.mailbox,
+        address.host,
+        address.route,
+    )
+    return (
+        name.decode("ascii") if name else None,
+        mailbox.decode("ascii") if mailbox else None,
+        host.decode("ascii") if host else None,
+        route.decode("ascii") if route else None,
+    )
+
+
+def _file_info(uid, file, with_envelope=True):
+    # type: (int, Dict[bytes, Union[bytes, int, Envelope, Iterable[bytes]]], bool) -> Info
+    """Build the info of a message from its FETCH data.
+
+    Unless ``with_envelope`` is set, only the date of the envelope is
+    used, sparing the decoding of its subject and addresses.
+    """
     raw_info = {
         "basic": {
-            "name": name + ".eml",
+            "name": f"{uid}.eml",
             "is_dir": False,
         },
         "details": {
@@ -126,63 +257,71 @@ def _file_info(name, file):
         },
         "imap": {},
     }
-    encoding = "ascii"
+    raw_header = None
     if file:
+        details = raw_info["details"]
+        imap_info = raw_info["imap"]
         if b"RFC822.SIZE" in file:
-            raw_info["details"]["size"] = file[b"RFC822.SIZE"]
+            details["size"] = file[b"RFC822.SIZE"]
         if b"FLAGS" in file:
-            raw_info["imap"]["flags"] = [
-                flag.decode(encoding) for flag in file[b"FLAGS"]
-            ]
+            imap_info["flags"] = [flag.decode("ascii") for flag in file[b"FLAGS"]]
         if b"ENVELOPE" in file:
             ev = file[b"ENVELOPE"]
             assert isinstance(ev, Envelope)
             if ev.date:
-                raw_info["details"]["accessed"] = ev.date.timestamp()
-                raw_info["details"]["modified"] = ev.date.timestamp()
-                raw_info["details"]["created"] = ev.date.timestamp()
-            # raw_info["imap"]["envelope"] = ev
-            raw_info["imap"]["subject"] = (
-                ev.subject.decode(encoding) if ev.subject else None
+                timestamp = ev.date.timestamp()
+                details["accessed"] = details["modified"] = timestamp
+                details["created"] = timestamp
+            if with_envelope:
+                imap_info["subject"] = (
+                    ev.subject.decode("ascii") if ev.subject else None
+                )
+                for key, addresses in (
+                    ("from", ev.from_),
+                    ("sender", ev.sender),
+                    ("reply_to", ev.reply_to),
+                    ("to", ev.to),
+                    ("cc", ev.cc),
+                    ("bcc", ev.bcc),
+                ):
+                    if addresses:
+                        imap_info[key] = [
+                            _tuple_address(address) for address in addresses
+                        ]
+                if ev.in_reply_to:
+                    imap_info["in_reply_to"] = ev.in_reply_to.decode("ascii")
+        raw_header = file.get(b"RFC822.HEADER")
+        if raw_header is None:
+            # a BODY[HEADER.FIELDS (...)] item, see `IMAPFS(header_fields=...)`
+            raw_header = next(
+                (v for k, v in file.items() if k.startswith(b"BODY[HEADER")), None
             )
-            if ev.from_:
-                raw_info["imap"]["from"] = [
-                    _tuple_address(address) for address in ev.from_
-                ]
-            if ev.sender:
-                raw_info["imap"]["sender"] = [
-                    _tuple_address(address) for address in ev.sender
-                ]
-            if ev.reply_to:
-                raw_info["imap"]["reply_to"] = [
-                    _tuple_address(address) for address in ev.reply_to
-                ]
-            if ev.to:
-                raw_info["imap"]["to"] = [_tuple_address(address) for address in ev.to]
-            if ev.cc:
-                raw_info["imap"]["cc"] = [_tuple_address(address) for address in ev.cc]
-            if ev.bcc:
-                raw_info["imap"]["bcc"] = [
-                    _tuple_address(address) for address in ev.bcc
-                ]
-            if ev.in_reply_to:
-                raw_info["imap"]["in_reply_to"] = ev.in_reply_to
-        if b"RFC822.HEADER" in file:
-            header = email.message_from_bytes(file[b"RFC822.HEADER"])
-            header_raw = {}
-            for key, item in header.items():
-                header_raw[key] = item
-            raw_info["imap"]["header"] = header_raw
 
-    return Info(raw_info)
+    # only fetched for the imap namespace, and parsed by `Info` when read
+    return Info(raw_info, raw_header=raw_header)
 
 
 @contextmanager
-def imap_errors(fs, path=None):
-    # type: (IMAPFS, Optional[Text]) -> Iterator[None]
+def imap_errors(fs, path=None, shared=True):
+    # type: (IMAPFS, Optional[Text], bool) -> Iterator[None]
+    """Translate IMAP errors, locking the filesystem around `fs.imap` use.
+
+    Blocks that only use a connection checked out of the pool pass
+    ``shared=False``: they neither take the filesystem lock nor touch the
+    state of the shared connection.
+    """
     try:
-        with fs._lock:
+        if not shared:
             yield
+        else:
+            with fs._lock:
+                try:
+                    yield
+                except (IMAP4.abort, socket.error):
+                    # force a health check on the next access to `fs.imap`
+                    fs._last_ok = 0.0
+                    raise
+                fs._last_ok = time.monotonic()
     except socket.error:
         raise errors.RemoteConnectionError(
             msg="unable to connect to {}".format(fs.host)
@@ -200,10 +339,19 @@ def imap_errors(fs, path=None):
         raise errors.FSError(str(type(e)))
 
 
+@functools.lru_cache(maxsize=1024)
+def _imap_path_pure(fs_path, delimiter):
+    # type: (Text, Text) -> Text
+    """Convert a filesystem path to an IMAP folder name."""
+    if delimiter == "/":
+        return fs_path.strip("/")
+    return fs_path.strip("/").replace("/", delimiter)
+
+
 def filename_split(file_name):
     # type: (Text) -> Tuple[Text, Text]
-    parts = file_name.rsplit(".", 1)
-    return (parts[0], "") if len(parts) == 1 else (parts[0], parts[1])
+    head, sep, tail = file_name.rpartition(".")
+    return (head, tail) if sep else (file_name, "")
 
 
 def _parse_imap_error(error):
@@ -219,43 +367,44 @@ def _parse_imap_error(error):
     return message, code
 
 
-if PY2:
-
-    def _encode(st, encoding):
-        # type: (Union[Text, bytes], Text) -> str
-        return st.encode(encoding) if isinstance(st, text_type) else st
-
-    def _decode(st, encoding):
-        # type: (Union[Text, bytes], Text) -> Text
-        return st.decode(encoding, "replace") if isinstance(st, bytes) else st
+def _fetch_key(section):
+    # type: (Text) -> bytes
+    """Get the key of a FETCH data item in the server response.
 
-else:
-
-    def _encode(st, _):
-        # type: (str, str) -> str
-        return st
-
-    def _decode(st, _):
-        # type: (str, str) -> str
-        return st
+    ``BODY.PEEK[...]`` is answered as ``BODY[...]`` and a partial
+    ``<origin.length>`` suffix is answered as ``<origin>``.
+    """
+    key = section.upper().replace("BODY.PEEK[", "BODY[")
+    if key.endswith(">"):
+        key = key[: key.rindex(".")] + ">"
+    return key.encode("ascii")
 
 
 class IMAPFile(io.BytesIO):
-    def __init__(self, imapfs, path, mode):
-        # type: (IMAPFS, Text, Text) -> None
+    def __init__(self, imapfs, path, mode, section="BODY.PEEK[]"):
+        # type: (IMAPFS, Text, Text, Text) -> None
         self.fs = imapfs
         self.path = path
         self.mode = Mode(mode)
 
         if self.mode.reading:
             folder, file_name = split(self.path)
-            file_id = filename_split(file_name)[0]
+            try:
+                file_id = int(filename_split(file_name)[0])
+            except ValueError:
+                raise errors.ResourceNotFound(self.path)
             with imap_errors(self.fs, self.path):
-                self.fs.imap.select_folder(self.fs._imap_path(folder))
-                data = [f for f in self.fs.imap.fetch(file_id, ["RFC822"]).values()][0][
-                    b"RFC822"
-                ]
-                super().__init__(data)
+                if ".PEEK[" not in section.upper():
+                    # the fetch sets the \Seen flag, and the folder unseen count
+                    self.fs._invalidate_info(self.path, folder)
+                try:
+                    self.fs._ensure_selected(self.fs._imap_path(folder))
+                except IMAP4.error:
+                    raise errors.ResourceNotFound(self.path)
+                response = self.fs.imap.fetch([file_id], [section])
+                if file_id not in response:
+                    raise errors.ResourceNotFound(self.path)
+                super().__init__(response[file_id][_fetch_key(section)])
         else:
             super().__init__()
 
@@ -315,11 +464,24 @@ class IMAPFS(FS):
         port (int): IMAP port number (default 993).
         user (str): A username (default is ``'anonymous'``).
         passwd (str): Password for the server, or `None` for anon.
+        max_connections (int): Maximum number of extra connections used
+            to run independent per-folder commands in parallel (default
+            4). Use ``0`` to keep everything on a single connection.
+        fetch_batch_size (int): Number of messages requested by each
+            ``FETCH`` when scanning a folder (default 500).
+        header_fields (list): Names of the header fields fetched for the
+            ``"imap"`` namespace, e.g. ``["Message-ID", "References"]``,
+            or `None` to fetch the whole header (default).
     """
 
     _delimiter: Text
     _ns_root: Text
 
+    # idle authenticated connections, shared by instances using the same
+    # account: (host, port, user, password digest) -> [IMAPClient, ...]
+    _idle_connections = {}  # type: Dict[Tuple, List[IMAPClient]]
+    _idle_lock = threading.Lock()
+
     _meta = {
         "invalid_path_chars": "\0",
         "network": True,
@@ -336,16 +498,52 @@ class IMAPFS(FS):
         port=None,  # type: Optional[int]
         user="anonymous",  # type: Text
         passwd="",  # type: Text
+        max_connections=4,  # type: int
+        fetch_batch_size=FETCH_BATCH_SIZE,  # type: int
+        header_fields=None,  # type: Optional[Collection[Text]]
     ):
         # type: (...) -> None
         super().__init__()
+        # set first, `close` runs from `__del__` even if the arguments are invalid
+        self._imap = None
+        # checked in (IMAPClient, time it was last used) pairs
+        self._pool = queue.LifoQueue()  # type: queue.LifoQueue[Tuple[Any, float]]
+        self._pool_size = 0
+        self._pool_lock = threading.Lock()
         self.host = host
         self.port = port
         self.user = user
         self.passwd = passwd
+        self.max_connections = max_connections
+        if fetch_batch_size < 1:
+            raise ValueError("fetch_batch_size must be at least 1")
+        self.fetch_batch_size = fetch_batch_size
+        if header_fields:
+            for field in header_fields:
+                if not RE_FIELD_NAME.fullmatch(field):
+                    raise ValueError("invalid header field name {!r}".format(field))
+            self._header_item = "BODY.PEEK[HEADER.FIELDS ({})]".format(
+                " ".join(field.upper() for field in header_fields)
+            )
+        else:
+            self._header_item = "RFC822.HEADER"
         self._welcome = None  # type: Optional[Text]
-        self._imap = None
         self._ns_root = None  # type: Optional[Text]
+        self._list_status = False
+        self._uidplus = False
+        self._folder_cache = None  # type: Optional[OrderedDict[Text, Tuple]]
+        self._folder_cache_ts = 0.0
+        self._last_ok = 0.0
+        # fs path -> (timestamp, with header, info)
+        self._info_cache = OrderedDict()  # type: OrderedDict[Text, Tuple]
+        self._root_info = Info(
+            {
+                "basic": {"name": "", "is_dir": True},
+                "details": {"type": int(ResourceType.directory)},
+            }
+        )
+        self._selected_folder = None  # type: Optional[Text]
+        self._selected = None  # type: Optional[Dict[bytes, Any]]
         self._get_imap()
 
     def __repr__(self):
@@ -357,7 +555,7 @@ class IMAPFS(FS):
         return (
             f"<imapfs '{self.host}'>"
             if self.port == 993
-            else f"<imapfs '{self.host}:{self.por}'>"
+            else f"<imapfs '{self.host}:{self.port}'>"
         )
 
     @property
@@ -368,9 +566,10 @@ class IMAPFS(FS):
 
     def _get_imap(self):
         # type: () -> IMAPClient
-        if self._imap is not None:
+        if self._imap is not None and time.monotonic() - self._last_ok > IDLE_NOOP_S:
             try:
                 self._imap.noop()
+                self._last_ok = time.monotonic()
             except (IMAP4.abort, ConnectionResetError, socket.error):
                 self._imap_shutdown()
                 self._imap = None
@@ -382,32 +581,190 @@ class IMAPFS(FS):
         # type: () -> IMAPClient
         """Open a new ftp object."""
         with imap_errors(self):
-            imap_client = IMAPClient(self.host, self.port)
-            imap_client.login(self.user, self.passwd)
+            imap_client = self._reuse_connection() or self._connect()
+            self._selected_folder = None
             self._welcome = imap_client.welcome
-            if imap_client.has_capability("NAMESPACE"):
-                personal_namespaces = imap_client.namespace().personal
-                for personal_namespace in personal_namespaces:
-                    self._ns_root = personal_namespace[0]
-                    self._delimiter = personal_namespace[1]
-                    break
-            else:
-                for _, delimiter, _ in imap_client.list_folders():
-                    if delimiter:
-                        self._ns_root = ""
-                        self._delimiter = delimiter.decode("ascii")
+            self._list_status = imap_client.has_capability("LIST-STATUS")
+            self._uidplus = imap_client.has_capability("UIDPLUS")
+            if self._ns_root is None:
+                # the namespace does not change across reconnections
+                if imap_client.has_capability("NAMESPACE"):
+                    personal_namespaces = imap_client.namespace().personal
+                    for personal_namespace in personal_namespaces:
+                        self._ns_root = personal_namespace[0]
+                        self._delimiter = personal_namespace[1]
                         break
                 else:
-                    self._ns_root = ""
-                    self._delimiter = ""
+                    for _, delimiter, _ in imap_client.list_folders():
+                        if delimiter:
+                            self._ns_root = ""
+                            self._delimiter = delimiter.decode("ascii")
+                            break
+                    else:
+                        self._ns_root = ""
+                        self._delimiter = ""
         return imap_client
 
+    def _account_key(self):
+        # type: () -> Tuple[Text, Optional[int], Text, bytes]
+        """Get the key of the idle connections of this account."""
+        digest = hashlib.sha256((self.passwd or "").encode("utf-8")).digest()
+        return (self.host, self.port, self.user, digest)
+
+    def _reuse_connection(self):
+        # type: () -> Optional[IMAPClient]
+        """Take a live idle connection to the same account, if any."""
+        key = self._account_key()
+        while True:
+            with self._idle_lock:
+                idle = self._idle_connections.get(key)
+                if not idle:
+                    return None
+                imap_client = idle.pop()
+            try:
+                imap_client.noop()
+            except Exception:
+                try:
+                    imap_client.shutdown()
+                except Exception:
+                    pass
+            else:
+                return imap_client
+
+    def _release_connection(self, imap_client):
+        # type: (IMAPClient) -> None
+        """Keep a live connection for reuse, or log it out."""
+        key = self._account_key()
+        try:
+            imap_client.noop()
+        except Exception:
+            try:
+                imap_client.shutdown()
+            except Exception:
+                pass
+            return
+        with self._idle_lock:
+            idle = self._idle_connections.setdefault(key, [])
+            if len(idle) < MAX_IDLE_CONNECTIONS:
+                idle.append(imap_client)
+                return
+        try:
+            imap_client.logout()
+        except Exception:
+            pass
+
+    @classmethod
+    def close_idle_connections(cls):
+        # type: () -> None
+        """Log out the idle connections kept for reuse by closed filesystems.
+
+        Called at interpreter exit.
+        """
+        with cls._idle_lock:
+            idle_connections = [
+                imap_client
+                for idle in cls._idle_connections.values()
+                for imap_client in idle
+            ]
+            cls._idle_connections.clear()
+        for imap_client in idle_connections:
+            try:
+                imap_client.logout()
+            except Exception:
+                pass
+
+    def _connect(self):
+        # type: () -> IMAPClient
+        """Open and authenticate a new IMAP connection."""
+        imap_client = IMAPClient(self.host, self.port)
+        imap_client.login(self.user, self.passwd)
+        return imap_client
+
+    @contextmanager
+    def _pooled_imap(self):
+        # type: () -> Iterator[IMAPClient]
+        """Check out a pooled connection, opening one if the pool allows.
+
+        Like `fs.imap`, a connection idle for more than `IDLE_NOOP_S` is
+        checked with a ``NOOP``, and replaced if the server dropped it.
+        """
+        try:
+            imap_client, last_ok = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                create = self._pool_size < self.max_connections
+                if create:
+                    self._pool_size += 1
+            if create:
+                imap_client, last_ok = None, 0.0
+            else:
+                imap_client, last_ok = self._pool.get()
+        if imap_client is not None and time.monotonic() - last_ok > IDLE_NOOP_S:
+            try:
+                imap_client.noop()
+            except Exception:
+                try:
+                    imap_client.shutdown()
+                except Exception:
+                    pass
+                imap_client = None
+        if imap_client is None:
+            try:
+                imap_client = self._reuse_connection() or self._connect()
+            except Exception:
+                with self._pool_lock:
+                    self._pool_size -= 1
+                raise
+        try:
+            yield imap_client
+        except (IMAP4.abort, socket.error):
+            with self._pool_lock:
+                self._pool_size -= 1
+            try:
+                imap_client.shutdown()
+            except Exception:
+                pass
+            raise
+        except Exception:
+            self._pool.put((imap_client, time.monotonic()))
+            raise
+        else:
+            self._pool.put((imap_client, time.monotonic()))
+
+    def _folder_statuses(self, imap_paths):
+        # type: (List[Text]) -> List[Dict[bytes, int]]
+        """Get the STATUS of several folders, in parallel over the pool."""
+        if self.max_connections < 2 or len(imap_paths) < 2:
+            return [self.imap.folder_status(imap_path) for imap_path in imap_paths]
+
+        def _folder_status(imap_path):
+            # type: (Text) -> Dict[bytes, int]
+            with self._pooled_imap() as imap_client:
+                return imap_client.folder_status(imap_path)
+
+        workers = min(self.max_connections, len(imap_paths))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_folder_status, imap_paths))
+
+    def _ensure_selected(self, imap_path):
+        # type: (Text) -> Dict[bytes, Any]
+        """Select ``imap_path`` unless it is already the selected folder.
+
+        A selection that reported no messages is never reused, as its
+        ``EXISTS`` count would hide messages appended since.
+        """
+        # a reconnection made by `fs.imap` forgets the selected folder, so
+        # get the connection before checking it
+        imap = self.imap
+        if imap_path != self._selected_folder or not self._selected[b"EXISTS"]:
+            self._selected_folder = None
+            self._selected = imap.select_folder(imap_path)
+            self._selected_folder = imap_path
+        return self._selected
+
     def _imap_path(self, fs_path):
         # type: (Text) -> Text
-        fs_path = fs_path.lstrip("/") if fs_path.startswith("/") else fs_path
-        fs_path = fs_path.rstrip("/") if fs_path.endswith("/") else fs_path
-        fs_path = fs_path.replace("/", self._delimiter)
-        return fs_path
+        return _imap_path_pure(fs_path, self._delimiter)
 
     def _imap_shutdown(self):
         if self._imap is not None:
@@ -431,18 +788,112 @@ class IMAPFS(FS):
         _meta = {}  # type: Dict[Text, object]
         if namespace == "standard":
             _meta = self._meta.copy()
-            with imap_errors(self):
-                _meta["unicode_paths"] = self.imap.folder_encode
+            # a client attribute, no need to open or check the connection
+            imap = self._imap
+            _meta["unicode_paths"] = imap.folder_encode if imap is not None else True
         return _meta
 
+    def _folders(self):
+        # type: () -> OrderedDict[Text, Tuple[Tuple[bytes, ...], bytes, Text]]
+        """Get the folder hierarchy, listing it again once the cache is stale."""
+        if (
+            self._folder_cache is None
+            or time.monotonic() - self._folder_cache_ts > FOLDER_CACHE_TTL
+        ):
+            self._folder_cache = OrderedDict(
+                (folder[2], folder) for folder in self.imap.list_folders()
+            )
+            self._folder_cache_ts = time.monotonic()
+        return self._folder_cache
+
+    def _folder_exists_cached(self, imap_path):
+        # type: (Text) -> bool
+        return imap_path in self._folders()
+
+    def _list_children_cached(self, imap_path):
+        # type: (Text) -> List[Tuple[Tuple[bytes, ...], bytes, Text]]
+        """Cached equivalent of ``list_folders(imap_path)``."""
+        return [
+            folder
+            for name, folder in self._folders().items()
+            if name.startswith(imap_path)
+        ]
+
     def _get_folder_list(self, fs_path):
         # type: (Text) -> Iterable[Tuple[bytes, Text, Text]]
-        imap = self.imap
-        folder_list = imap.list_folders(self._imap_path(fs_path))
+        folder_list = self._list_children_cached(self._imap_path(fs_path))
         if len(folder_list) == 1:
             flags, delimiter, _ = folder_list[0]
             if delimiter is None and b"\\Noinferiors" in flags:
-                folder_list = imap.list_folders("")
+                folder_list = self._list_children_cached("")
+        return folder_list
+
+    def _list_folders_status(self, directory="", pattern="*"):
+        # type: (Text, Text) -> List[Tuple[Tuple[bytes, ...], bytes, Text, Optional[Dict[bytes, int]]]]
+        """List folders together with their STATUS (RFC 5819 LIST-STATUS).
+
+        IMAPClient has no public API for ``LIST ... RETURN (STATUS ...)``,
+        so the command is issued on the underlying imaplib connection and
+        both the ``LIST`` and ``STATUS`` untagged responses are parsed.
+        """
+        imap = self.imap
+        typ, data = imap._imap._simple_command(
+            "LIST",
+            imap._normalise_folder(directory),
+            imap._normalise_folder(pattern),
+            "RETURN",
+            "(STATUS ({}))".format(" ".join(STATUS_ITEMS)),
+        )
+        imap._checkok("list", typ, data)
+        status_data = imap._imap.untagged_responses.pop("STATUS", [])
+        typ, data = imap._imap._untagged_response(typ, data, "LIST")
+        statuses = {}
+        for line in status_data:
+            name, items = parse_response([line])
+            if isinstance(name, int):
+                name = str(name)
+            elif imap.folder_encode:
+                name = decode_utf7(name)
+            statuses[name] = dict(zip(items[::2], items[1::2]))
+        return [
+            (flags, delimiter, name, statuses.get(name))
+            for flags, delimiter, name in imap._proc_folder_list(data)
+        ]
+
+    def _fetch_all(self, fetch_items):
+        # type: (List[Text]) -> Dict[int, Dict[bytes, Any]]
+        """Fetch ``fetch_items`` for every message of the selected folder.
+
+        IMAPClient only fetches explicit message ids, so ``UID FETCH 1:*``
+        is issued on the underlying imaplib connection, saving the
+        ``SEARCH`` round trip otherwise needed to list the ids first.
+        Unsolicited ``FETCH`` responses, e.g. flag changes made by other
+        sessions, carry no ``UID`` and are left out.
+        """
+        imap = self.imap
+        typ, data = imap._imap._simple_command(
+            "UID", "FETCH", "1:*", "({})".format(" ".join(fetch_items))
+        )
+        imap._checkok("fetch", typ, data)
+        typ, data = imap._imap._untagged_response(typ, data, "FETCH")
+        return {
+            file[b"UID"]: file
+            for file in parse_fetch_response(data, imap.normalise_times, False).values()
+            if b"UID" in file
+        }
+
+    def _get_folder_status_list(self, fs_path):
+        # type: (Text) -> Iterable[Tuple[Tuple[bytes, ...], bytes, Text, Optional[Dict[bytes, int]]]]
+        if not self._list_status:
+            return [
+                (flags, delimiter, name, None)
+                for flags, delimiter, name in self._get_folder_list(fs_path)
+            ]
+        folder_list = self._list_folders_status(self._imap_path(fs_path))
+        if len(folder_list) == 1:
+            flags, delimiter, _, _ = folder_list[0]
+            if delimiter is None and b"\\Noinferiors" in flags:
+                folder_list = self._list_folders_status("")
         return folder_list
 
     def listdir(self, path):
@@ -451,11 +902,12 @@ class IMAPFS(FS):
         if not self.getinfo(path).is_dir:
             raise errors.DirectoryExpected(path)
         dir_list = []
+        imap_dir_path = self._imap_path(fs_dir_path)
         with imap_errors(self, path):
             imap = self.imap
             try:
                 if fs_dir_path != "/":
-                    selected = imap.select_folder(self._imap_path(fs_dir_path))
+                    selected = self._ensure_selected(imap_dir_path)
                 else:
                     selected = None
             except IMAP4.error:
@@ -468,67 +920,98 @@ class IMAPFS(FS):
                 if b"\\Noinferiors" in flags:
                     pass
                 else:
-                    delimiter = delimiter.decode("ascii") if delimiter else None
-                    parent_folder = None
-                    sub_folder = None
                     if delimiter:
-                        folder_split = name.rsplit(delimiter, 1)
-                        if len(folder_split) == 1:
-                            parent_folder, sub_folder = "", folder_split[0]
-                        else:
-                            parent_folder, sub_folder = folder_split[0], folder_split[1]
-                    if parent_folder == self._imap_path(fs_dir_path):
+                        parent_folder, _, sub_folder = name.rpartition(
+                            delimiter.decode("ascii")
+                        )
+                    else:
+                        parent_folder = sub_folder = None
+                    if parent_folder == imap_dir_path:
                         dir_list.append(sub_folder)
         return dir_list
 
     def getinfo(self, path, namespaces=None):
         # type: (Text, Optional[Collection[Text]]) -> Info
+        if path == "/":
+            self.check()
+            return self._root_info
         fs_path = self.validatepath(path)
         if fs_path == "/":
-            return Info(
-                {
-                    "basic": {"name": "", "is_dir": True},
-                    "details": {"type": int(ResourceType.directory)},
-                }
-            )
-
+            return self._root_info
+        with_header = bool(namespaces) and "imap" in namespaces
+        with self._lock:
+            cached = self._info_cache.get(fs_path)
+            if (
+                cached is not None
+                and time.monotonic() - cached[0] <= INFO_CACHE_TTL
+                and cached[1] >= with_header
+            ):
+                return cached[2]
+        info = self._getinfo(path, fs_path, with_header)
+        if info is not None:
+            with self._lock:
+                self._info_cache[fs_path] = (time.monotonic(), with_header, info)
+                self._info_cache.move_to_end(fs_path)
+                while len(self._info_cache) > INFO_CACHE_SIZE:
+                    self._info_cache.popitem(last=False)
+        return info
+
+    def _invalidate_info(self, *fs_paths):
+        # type: (*Text) -> None
+        """Drop the cached info of the given paths and of their contents."""
+        with self._lock:
+            for fs_path in fs_paths:
+                prefix = fs_path.rstrip("/") + "/"
+                for cached_path in list(self._info_cache):
+                    if cached_path == fs_path or cached_path.startswith(prefix):
+                        del self._info_cache[cached_path]
+
+    def _getinfo(self, path, fs_path, with_header):
+        # type: (Text, Text, bool) -> Info
         with imap_errors(self, path):
             imap = self.imap
-            if fs_path.endswith(".eml"):
+            if fs_path.endswith(".eml") and not self._folder_exists_cached(
+                self._imap_path(fs_path)
+            ):
                 # looking for a file
                 fs_dir_path, fs_element = split(fs_path)
                 imap_dir_path = self._imap_path(fs_dir_path)
                 try:
-                    selected = imap.select_folder(imap_dir_path)
+                    selected = self._ensure_selected(imap_dir_path)
                     if not selected[b"EXISTS"]:
                         raise errors.ResourceNotFound(path)
                     else:
                         file_id = int(filename_split(fs_element)[0])
-                        fetch_dict = imap.fetch(
-                            [file_id],
-                            ["FLAGS", "ENVELOPE", "RFC822.SIZE", "RFC822.HEADER"],
-                        )
+                        fetch_items = ["FLAGS", "ENVELOPE", "RFC822.SIZE"]
+                        if with_header:
+                            fetch_items.append(self._header_item)
+                        fetch_dict = imap.fetch([file_id], fetch_items)
                         if file_id in fetch_dict:
-                            return _file_info(str(file_id), fetch_dict[file_id])
+                            return _file_info(file_id, fetch_dict[file_id])
                         else:
                             raise errors.ResourceNotFound(path)
-                except IMAP4.error:
+                except (IMAP4.error, ValueError):
                     raise errors.ResourceNotFound(path)
             else:
                 # looking for a folder
-                if imap.folder_exists(self._imap_path(fs_path)):
-                    folder_status = imap.folder_status(self._imap_path(fs_path))
+                imap_path = self._imap_path(fs_path)
+                if self._folder_exists_cached(imap_path):
+                    folder_status = imap.folder_status(imap_path)
                     fs_folder_path = split(fs_path)[0]
-                    folders = imap.list_folders(self._imap_path(fs_folder_path))
+                    folders = self._list_children_cached(
+                        self._imap_path(fs_folder_path)
+                    )
                     while (
                         len(folders) == 0
                         or len(folders) == 1
                         and b"\\Noinferiors" in folders[0][0]
                     ):
                         fs_folder_path = split(fs_folder_path)[0]
-                        folders = imap.list_folders(self._imap_path(fs_folder_path))
+                        folders = self._list_children_cached(
+                            self._imap_path(fs_folder_path)
+                        )
                     for flags, _delimiter, name in folders:
-                        if name == self._imap_path(fs_path):
+                        if name == imap_path:
                             return _dir_info(
                                 name=split(fs_path)[1],
                                 flags=flags,
@@ -537,6 +1020,30 @@ class IMAPFS(FS):
                 else:
                     raise errors.ResourceNotFound(path)
 
+    def exists(self, path):
+        # type: (Text) -> bool
+        if self.isdir(path):
+            return True
+        if self.validatepath(path).endswith(".eml"):
+            return super().exists(path)
+        return False
+
+    def isdir(self, path):
+        # type: (Text) -> bool
+        fs_path = self.validatepath(path)
+        if fs_path == "/":
+            return True
+        # the folder hierarchy is enough, unlike getinfo no STATUS is needed;
+        # it is checked even for .eml names, which folders may have too
+        with imap_errors(self, path):
+            return self._folder_exists_cached(self._imap_path(fs_path))
+
+    def isfile(self, path):
+        # type: (Text) -> bool
+        if not self.validatepath(path).endswith(".eml"):
+            return False
+        return super().isfile(path)
+
     def setinfo(self, path, info):
         # type: (Text, Dict[Text, Dict[Text, Union[Text, List[Text]]]]) -> None
         _fs_path = self.validatepath(path)
@@ -555,9 +1062,11 @@ class IMAPFS(FS):
                     else:
                         flags = imap_details["flags"]
                     folder, file_name = split(_fs_path)
-                    self.imap.select_folder(self._imap_path(folder))
+                    # the folder STATUS counts unseen messages
+                    self._invalidate_info(_fs_path, folder)
+                    self._ensure_selected(self._imap_path(folder))
                     self.imap.set_flags(
-                        filename_split(file_name)[0],
+                        [int(filename_split(file_name)[0])],
                         [
                             f if isinstance(f, bytes) else f.encode("ascii")
                             for f in flags
@@ -568,48 +1077,97 @@ class IMAPFS(FS):
         self,
         path,  # type: Text
         namespaces=None,  # type: Optional[Collection[Text]]
+        page=None,  # type: Optional[Tuple[int, int]]
     ):
         # type: (...) -> Iterator[Info]
         fs_dir_path = self.validatepath(path)
+        imap_dir_path = self._imap_path(fs_dir_path)
+        file_count = 0
         with imap_errors(self, fs_dir_path):
+            previous = self._selected
             try:
                 if fs_dir_path != "/":
-                    selected = self.imap.select_folder(self._imap_path(fs_dir_path))
+                    selected = self._ensure_selected(imap_dir_path)
                 else:
                     selected = None
             except IMAP4.error:
                 raise errors.ResourceNotFound(fs_dir_path)
             else:
                 if selected and selected[b"EXISTS"]:
-                    page_size = 10
-                    all_files = self.imap.search()
-                    for file_group in [all_files[i:i+page_size] for i in range(0, len(all_files), page_size)]:
-                        for file_name, file in self.imap.fetch(
-                            file_group,
-                            ["FLAGS", "ENVELOPE", "RFC822.SIZE", "RFC822.HEADER"],
-                        ).items():
-                            yield _file_info(str(file_name), file)
-
-            for flags, delimiter, name in self._get_folder_list(fs_dir_path):
+                    imap = self.imap
+                    fetch_items = _fetch_items(namespaces, self._header_item)
+                    with_envelope = "imap" in namespaces if namespaces else False
+                    # only a fresh SELECT tells the current number of messages,
+                    # the EXISTS of a reused one may predate later APPENDs
+                    if (
+                        fetch_items
+                        and page is None
+                        and selected is not previous
+                        and selected[b"EXISTS"] <= self.fetch_batch_size
+                    ):
+                        # a single FETCH covers the whole folder
+                        for file_name, file in self._fetch_all(fetch_items).items():
+                            yield _file_info(file_name, file, with_envelope)
+                    else:
+                        all_files = imap.search()
+                        file_count = len(all_files)
+                        if page is not None:
+                            all_files = all_files[page[0] : page[1]]
+                        if not fetch_items:
+                            # the basic namespace only needs the message ids
+                            for file_name in all_files:
+                                yield _file_info(file_name, {})
+                        else:
+                            batch_size = self.fetch_batch_size
+                            for start in range(0, len(all_files), batch_size):
+                                file_group = all_files[start : start + batch_size]
+                                for file_name, file in imap.fetch(
+                                    file_group, fetch_items
+                                ).items():
+                                    yield _file_info(file_name, file, with_envelope)
+
+            if namespaces and "imap" in namespaces:
+                folder_list = self._get_folder_status_list(fs_dir_path)
+            else:
+                # the folder status only fills the imap namespace
+                folder_list = [
+                    (flags, delimiter, name, {})
+                    for flags, delimiter, name in self._get_folder_list(fs_dir_path)
+                ]
+            sub_folders = []
+            for flags, delimiter, name, folder_status in folder_list:
                 if b"\\Noinferiors" in flags:
                     pass
                 else:
-                    delimiter = delimiter.decode("ascii") if delimiter else None
-                    parent_folder = None
-                    sub_folder = None
                     if delimiter:
-                        folder_split = name.rsplit(delimiter, 1)
-                        if len(folder_split) == 1:
-                            parent_folder, sub_folder = "", folder_split[0]
-                        else:
-                            parent_folder, sub_folder = folder_split[0], folder_split[1]
-                    if parent_folder == self._imap_path(fs_dir_path):
-                        folder_status = self.imap.folder_status(
-                            self._imap_path(join(fs_dir_path, sub_folder))
-                        )
-                        yield _dir_info(
-                            name=sub_folder, flags=flags, folder_status=folder_status
+                        parent_folder, _, sub_folder = name.rpartition(
+                            delimiter.decode("ascii")
                         )
+                    else:
+                        parent_folder = sub_folder = None
+                    if parent_folder == imap_dir_path:
+                        sub_folders.append((sub_folder, name, flags, folder_status))
+            if page is not None:
+                # folders come after the files in the listing
+                start, end = page
+                sub_folders = sub_folders[
+                    max(start - file_count, 0) : max(end - file_count, 0)
+                ]
+            folder_statuses = iter(
+                self._folder_statuses(
+                    [
+                        name
+                        for _, name, _, folder_status in sub_folders
+                        if folder_status is None
+                    ]
+                )
+            )
+            for sub_folder, _, flags, folder_status in sub_folders:
+                if folder_status is None:
+                    folder_status = next(folder_statuses)
+                yield _dir_info(
+                    name=sub_folder, flags=flags, folder_status=folder_status
+                )
 
     def scandir(
         self,
@@ -638,11 +1196,7 @@ class IMAPFS(FS):
             fs.errors.ResourceNotFound: If ``path`` does not exist.
 
         """
-        iter_info = self._scandir(path, namespaces=namespaces)
-        if page is not None:
-            start, end = page
-            iter_info = itertools.islice(iter_info, start, end)
-        return iter_info
+        return self._scandir(path, namespaces=namespaces, page=page)
 
     def makedir(
         self,
@@ -662,15 +1216,18 @@ class IMAPFS(FS):
             if self.exists(path) and not recreate:
                 raise errors.DirectoryExists(path)
             if not (recreate and self.isdir(path)):
-                folders = _fs_path.split("/")
-                check_folder = ""
-                for n, folder in enumerate(folders):
-                    if n == 0:
-                        check_folder = folder
-                    elif n < len(folders):
-                        check_folder += "/" + folder
-                    if n < len(folders) - 1 and not self.exists(check_folder):
+                parents = _fs_path.strip("/").split("/")[:-1]
+                imap_parents = [
+                    self._imap_path("/".join(parents[: n + 1]))
+                    for n in range(len(parents))
+                ]
+                if not all(map(self._folder_exists_cached, imap_parents)):
+                    # the cached hierarchy may be stale, list it once more
+                    self._folder_cache = None
+                    if not all(map(self._folder_exists_cached, imap_parents)):
                         raise errors.ResourceNotFound(path)
+                self._folder_cache = None
+                self._invalidate_info(dirname(_fs_path))
                 try:
                     self.imap.create_folder(self._imap_path(_fs_path))
                 except IMAP4.error as error:
@@ -684,37 +1241,134 @@ class IMAPFS(FS):
         # type: (Text, bytes) -> Tuple[Text, Text]
         _fs_path = self.validatepath(path)
         with imap_errors(self, path):
+            self._invalidate_info(_fs_path)
             result = self.imap.append(self._imap_path(path), msg)
-            append_info = (
-                RE_APPEND_INFO.search(result.decode("ascii")).group("list").split(" ")
-            )
-            return append_info[1], append_info[2]
+            # b"[APPENDUID <uidvalidity> <uid>] ..." (RFC 4315)
+            start = result.index(b"[") + 1
+            append_info = result[start : result.index(b"]", start)].split()
+            return append_info[1].decode("ascii"), append_info[2].decode("ascii")
+
+    def readbytes_many(self, paths):
+        # type: (Iterable[Text]) -> Dict[Text, bytes]
+        """Get the contents of several files as bytes.
+
+        Files are grouped by folder, so that each folder costs a single
+        ``FETCH`` whatever the number of files read from it.
+
+        Arguments:
+            paths (list): A list of paths to files on the filesystem.
+
+        Returns:
+            dict: a mapping of each path to the file contents.
+
+        Raises:
+            fs.errors.ResourceNotFound: If a path does not exist.
+
+        """
+        folders = OrderedDict()  # type: OrderedDict[Text, Dict[int, Text]]
+        for path in paths:
+            folder, file_name = split(self.validatepath(path))
+            try:
+                file_id = int(filename_split(file_name)[0])
+            except ValueError:
+                raise errors.ResourceNotFound(path)
+            folders.setdefault(folder, {})[file_id] = path
+
+        def _fetch_pooled(folder):
+            # type: (Text) -> Dict[int, Dict[bytes, Any]]
+            # errors are translated outside, so that the pool sees a lost
+            # connection and drops it
+            with imap_errors(self, folder, shared=False):
+                with self._pooled_imap() as imap_client:
+                    try:
+                        imap_client.select_folder(self._imap_path(folder))
+                    except IMAP4.abort:
+                        raise
+                    except IMAP4.error:
+                        raise errors.ResourceNotFound(folder)
+                    return imap_client.fetch(list(folders[folder]), ["BODY.PEEK[]"])
+
+        if self.max_connections >= 2 and len(folders) >= 2:
+            # independent folders are read concurrently over the pool
+            workers = min(self.max_connections, len(folders))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                fetch_dicts = list(executor.map(_fetch_pooled, folders))
+        else:
+            fetch_dicts = []
+            for folder, files in folders.items():
+                with imap_errors(self, folder):
+                    try:
+                        self._ensure_selected(self._imap_path(folder))
+                    except IMAP4.error:
+                        raise errors.ResourceNotFound(folder)
+                    fetch_dicts.append(self.imap.fetch(list(files), ["BODY.PEEK[]"]))
+
+        contents = {}
+        for (folder, files), fetch_dict in zip(folders.items(), fetch_dicts):
+            for file_id, path in files.items():
+                if file_id not in fetch_dict:
+                    raise errors.ResourceNotFound(path)
+                contents[path] = fetch_dict[file_id][b"BODY[]"]
+        return contents
 
     def openbin(self, path, mode="r", buffering=-1, **options):
         # type: (Text, Text, int, **Any) -> BinaryIO
+        """Open a binary file-like object.
+
+        Arguments:
+            path (str): A path on the filesystem.
+            mode (str): Mode to open file (must be a valid non-text mode,
+                defaults to *r*).
+            buffering (int): Buffering policy (unused).
+            **options: ``imap_section`` selects the FETCH data item read
+                from the message (defaults to ``'BODY.PEEK[]'``, which
+                leaves the ``\\Seen`` flag untouched; use ``'RFC822'`` to
+                mark the message as read, or ``'BODY.PEEK[HEADER]'`` for
+                the header only). ``size`` limits the read to the first
+                ``size`` bytes of the section with a partial FETCH, using
+                the ``BODY[...]`` equivalent of ``RFC822`` sections.
+
+        Returns:
+            io.IOBase: a *file-like* object.
+
+        Raises:
+            fs.errors.FileExpected: If ``path`` exists and is not a file.
+            fs.errors.FileExists: If the ``path`` exists, and
+                *exclusive mode* is specified (``x`` in the mode).
+            fs.errors.ResourceNotFound: If ``path`` does not exist and
+                ``mode`` does not imply creating the file, or if any
+                ancestor of ``path`` does not exist.
+
+        """
         mode_object = Mode(mode)
         mode_object.validate_bin()
         fs_path = self.validatepath(path)
         fs_folder, fs_file_name = split(fs_path)
         with imap_errors(self, path):
-            try:
-                info = self.getinfo(fs_path)
-            except errors.ResourceNotFound:
-                if mode_object.reading:
-                    raise errors.ResourceNotFound(path)
-                if mode_object.writing and not self.isdir(dirname(fs_path)):
-                    raise errors.ResourceNotFound(path)
-            else:
-                if info.is_dir:
-                    raise errors.FileExpected(path)
-                if info.is_file and mode_object.writing:
-                    raise errors.FileExists(path)
-            if filename_split(fs_file_name)[1] != "eml":
+            # a message opened for reading is looked up by its own FETCH
+            if mode_object.writing or not fs_file_name.endswith(".eml"):
+                try:
+                    info = self.getinfo(fs_path)
+                except errors.ResourceNotFound:
+                    if mode_object.reading:
+                        raise errors.ResourceNotFound(path)
+                    if mode_object.writing and not self.isdir(dirname(fs_path)):
+                        raise errors.ResourceNotFound(path)
+                else:
+                    if info.is_dir:
+                        raise errors.FileExpected(path)
+                    if info.is_file and mode_object.writing:
+                        raise errors.FileExists(path)
+            if not fs_file_name.endswith(".eml"):
                 raise errors.PathError(
                     path=path,
                     msg="path '{path}' is invalid because file must have '.eml' extension.",
                 )
-            imap_file = IMAPFile(self, fs_path, mode)
+            section = options.get("imap_section", "BODY.PEEK[]")
+            if options.get("size") is not None:
+                section = RFC822_SECTIONS.get(section.upper(), section)
+                section = "{}<0.{}>".format(section, int(options["size"]))
+            imap_file = IMAPFile(self, fs_path, mode, section=section)
         return imap_file  # type: ignore
 
     def copy(
@@ -742,15 +1396,60 @@ class IMAPFS(FS):
                     else:
                         raise errors.FileExists(dst_path)
             _src_folder, _src_file = split(_src_path)
-            self.imap.select_folder(self._imap_path(_src_folder))
+            self._ensure_selected(self._imap_path(_src_folder))
             _dst_folder, _dst_file = split(_dst_path)
+            self._invalidate_info(_dst_folder)
             try:
                 self.imap.copy(
-                    filename_split(_src_file)[0], self._imap_path(_dst_folder)
+                    [int(filename_split(_src_file)[0])], self._imap_path(_dst_folder)
                 )
             except IMAP4.error:
                 raise errors.ResourceNotFound(dst_path)
 
+    def copy_many(self, pairs):
+        # type: (Iterable[Tuple[Text, Text]]) -> None
+        """Copy several files.
+
+        Files are grouped by source and destination folder, so that each
+        pair of folders costs a single ``COPY`` per `MESSAGE_SET_SIZE`
+        files copied between them. A copied message gets a new UID, so
+        only the folder of each destination path is used.
+
+        Arguments:
+            pairs (list): A list of ``(src_path, dst_path)`` tuples.
+
+        Raises:
+            fs.errors.ResourceNotFound: If a source path is not a
+                message path, or a folder does not exist.
+
+        """
+        groups = OrderedDict()  # type: OrderedDict[Tuple[Text, Text], List[int]]
+        for src_path, dst_path in pairs:
+            src_folder, src_file = split(self.validatepath(src_path))
+            try:
+                file_id = int(filename_split(src_file)[0])
+            except ValueError:
+                raise errors.ResourceNotFound(src_path)
+            dst_folder = dirname(self.validatepath(dst_path))
+            groups.setdefault((src_folder, dst_folder), []).append(file_id)
+
+        batch_size = MESSAGE_SET_SIZE
+        for (src_folder, dst_folder), file_ids in groups.items():
+            with imap_errors(self, src_folder):
+                try:
+                    self._ensure_selected(self._imap_path(src_folder))
+                except IMAP4.error:
+                    raise errors.ResourceNotFound(src_folder)
+                self._invalidate_info(dst_folder)
+                for start in range(0, len(file_ids), batch_size):
+                    try:
+                        self.imap.copy(
+                            file_ids[start : start + batch_size],
+                            self._imap_path(dst_folder),
+                        )
+                    except IMAP4.error:
+                        raise errors.ResourceNotFound(dst_folder)
+
     def remove(self, path):
         # type: (Text) -> None
         _fs_path = self.validatepath(path)
@@ -760,10 +1459,64 @@ class IMAPFS(FS):
             if not self.exists(path):
                 raise errors.ResourceNotFound(path=path)
             folder, file_name = split(_fs_path)
-            self.imap.select_folder(self._imap_path(folder))
-            result = self.imap.delete_messages(filename_split(file_name)[0])
-            for file_id in result.keys():
-                self.imap.expunge(file_id)
+            self._invalidate_info(folder, _fs_path)
+            self._ensure_selected(self._imap_path(folder))
+            imap = self.imap
+            file_id = int(filename_split(file_name)[0])
+            imap.delete_messages([file_id], silent=True)
+            if self._uidplus:
+                imap.uid_expunge([file_id])
+            else:
+                # without UIDPLUS the whole folder has to be expunged
+                imap.expunge()
+
+    def remove_many(self, paths):
+        # type: (Iterable[Text]) -> None
+        """Remove several files.
+
+        Files are grouped by folder, so that each folder costs one
+        ``STORE`` and one ``UID EXPUNGE`` per `MESSAGE_SET_SIZE` files
+        removed from it. Messages that are already gone are ignored.
+
+        Warning:
+            Like `remove`, on servers without the UIDPLUS extension the
+            folder is cleaned with a plain ``EXPUNGE``, which also
+            removes any message other clients flagged as ``\\Deleted``.
+
+        Arguments:
+            paths (list): A list of paths to files on the filesystem.
+
+        Raises:
+            fs.errors.ResourceNotFound: If a path is not a message path,
+                or its folder does not exist.
+
+        """
+        folders = OrderedDict()  # type: OrderedDict[Text, List[int]]
+        for path in paths:
+            folder, file_name = split(self.validatepath(path))
+            try:
+                file_id = int(filename_split(file_name)[0])
+            except ValueError:
+                raise errors.ResourceNotFound(path)
+            folders.setdefault(folder, []).append(file_id)
+
+        batch_size = MESSAGE_SET_SIZE
+        for folder, file_ids in folders.items():
+            with imap_errors(self, folder):
+                try:
+                    self._ensure_selected(self._imap_path(folder))
+                except IMAP4.error:
+                    raise errors.ResourceNotFound(folder)
+                self._invalidate_info(folder)
+                imap = self.imap
+                for start in range(0, len(file_ids), batch_size):
+                    file_group = file_ids[start : start + batch_size]
+                    imap.delete_messages(file_group, silent=True)
+                    if self._uidplus:
+                        imap.uid_expunge(file_group)
+                if not self._uidplus:
+                    # without UIDPLUS the whole folder has to be expunged
+                    imap.expunge()
 
     def removedir(self, path):
         # type: (Text) -> None
@@ -775,17 +1528,32 @@ class IMAPFS(FS):
                 raise errors.DirectoryExpected(path=path)
             if not self.isempty(path):
                 raise errors.DirectoryNotEmpty(path=path)
+            imap_path = self._imap_path(_fs_path)
+            self._invalidate_info(dirname(_fs_path), _fs_path)
             try:
-                self.imap.delete_folder(self._imap_path(_fs_path))
+                self.imap.delete_folder(imap_path)
             except IMAP4.error:
                 pass
+            if self._folder_cache is not None:
+                self._folder_cache.pop(imap_path, None)
+            if self._selected_folder == imap_path:
+                self._selected_folder = None
 
     def close(self):
         # type: () -> None
         if not self.isclosed():
+            while True:
+                try:
+                    imap_client, _ = self._pool.get_nowait()
+                except queue.Empty:
+                    break
+                self._release_connection(imap_client)
             try:
-                self.imap.logout()
-            except Exception:
-                self._imap_shutdown()
+                if self._imap is not None:
+                    self._release_connection(self._imap)
+                    self._imap = None
             finally:
                 super(IMAPFS, self).close()
+
+
+atexit.register(IMAPFS.close_idle_connections)